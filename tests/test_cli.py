@@ -21,6 +21,7 @@ from hypothesis import given
 
 from tests.helpers import fs_case_sensitive
 from tests.helpers import pyicu_sensitive
+from todoman.cli import _find_list_dirs
 from todoman.cli import cli
 from todoman.cli import exceptions
 from todoman.interactive import TodoEditor
@@ -145,6 +146,10 @@ def test_list_inexistant(
     assert result.exception
     assert "Error: Invalid value for '[LISTS]...': NONexistant" in result.output
 
+    result = runner.invoke(cli, ["list", "one", "default", "two"])
+    assert result.exception
+    assert "Error: Invalid value for '[LISTS]...': one, two. " in result.output
+
 
 def test_show_existing(
     tmpdir: py.path.local, runner: CliRunner, create: Callable
@@ -856,6 +861,31 @@ def test_cancel(runner: CliRunner, todo_factory: Callable, todos: Callable) -> N
     assert todo.status == "CANCELLED"
 
 
+def test_done_reports_saved_todos_on_error(
+    runner: CliRunner,
+    todo_factory: Callable,
+) -> None:
+    todo_factory(summary="first")
+    todo_factory(summary="second")
+    save = Database.save
+    saved = []
+
+    def save_once(db: Database, todo: Todo) -> None:
+        if saved:
+            raise exceptions.ReadOnlyTodoError(todo.path)
+        save(db, todo)
+        saved.append(todo.summary)
+
+    with patch.object(Database, "save", autospec=True, side_effect=save_once):
+        result = runner.invoke(cli, ["done", "1", "2"])
+
+    (unsaved,) = {"first", "second"} - set(saved)
+    assert result.exception
+    assert saved[0] in result.output
+    assert unsaved not in result.output
+    assert "read-only mode" in result.output
+
+
 def test_id_printed_for_new(runner: CliRunner) -> None:
     result = runner.invoke(cli, ["new", "-l", "default", "show me an id"])
     assert not result.exception
@@ -1132,6 +1162,7 @@ def test_default_command_args(config: py.path.local, runner: CliRunner) -> None:
     assert todos.call_args == call(
         sort=["due"],
         due=168,
+        limit=None,
         priority=9,
         reverse=False,
         lists=[],
@@ -1142,3 +1173,24 @@ def test_default_command_args(config: py.path.local, runner: CliRunner) -> None:
         startable=None,
         status="NEEDS-ACTION,IN-PROCESS",
     )
+
+
+def test_find_list_dirs(tmpdir: py.path.local) -> None:
+    calendars = tmpdir.mkdir("calendars")
+    calendars.mkdir("work")
+    calendars.mkdir("home")
+    calendars.mkdir(".hidden")
+    calendars.mkdir("__pycache__")
+    calendars.join("not_a_list.txt").write("")
+
+    assert sorted(_find_list_dirs(f"{calendars}/*")) == [
+        str(calendars.join("home")),
+        str(calendars.join("work")),
+    ]
+    assert _find_list_dirs(f"{calendars}/w*") == [str(calendars.join("work"))]
+    assert _find_list_dirs(f"{calendars}/.*") == [str(calendars.join(".hidden"))]
+    assert _find_list_dirs(f"{calendars}/missing/*") == []
+    assert _find_list_dirs(f"{calendars}/work") == [str(calendars.join("work"))]
+    assert _find_list_dirs(f"{calendars}/not_a_list.txt") == []
+    # Wildcards in parent directories fall back to glob:
+    assert _find_list_dirs(f"{tmpdir}/cal*/w*") == [str(calendars.join("work"))]
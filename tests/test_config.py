@@ -179,3 +179,44 @@ def test_colour_validation_invalid(config: py.path.local) -> None:
         return_value=(str(config)),
     ), pytest.raises(ConfigurationError):
         load_config()
+
+
+def test_load_config_picks_up_changes(config: py.path.local) -> None:
+    with patch(
+        "todoman.configuration.find_config",
+        return_value=(str(config)),
+    ):
+        cfg = load_config()
+        assert cfg["color"] == "auto"
+
+        # Changes to the returned dict must not leak into later loads.
+        cfg["color"] = "never"
+        assert load_config()["color"] == "auto"
+
+        config.write("color = 'always'\n", "a")
+        assert load_config()["color"] == "always"
+
+
+def test_non_literal_config(config: py.path.local, tmpdir: py.path.local) -> None:
+    config.write(
+        "import os\n"
+        f"path = os.path.join({str(tmpdir)!r}, '*')\n"
+        "default_due = 12 * 4\n"
+    )
+    with patch(
+        "todoman.configuration.find_config",
+        return_value=(str(config)),
+    ):
+        cfg = load_config()
+
+    assert cfg["path"] == f"{tmpdir}/*"
+    assert cfg["default_due"] == 48
+
+
+def test_bool_for_int_setting(config: py.path.local) -> None:
+    config.write("default_due = True\n", "a")
+    with patch(
+        "todoman.configuration.find_config",
+        return_value=(str(config)),
+    ), pytest.raises(ConfigurationError, match="expected int, got bool"):
+        load_config()
@@ -7,6 +7,7 @@ from uuid import uuid4
 
 import py
 from click.testing import CliRunner
+from dateutil.tz import tzlocal
 
 from todoman.cli import cli
 from todoman.model import Database
@@ -129,6 +130,12 @@ def test_grep(tmpdir: py.path.local, runner: CliRunner, create: Callable) -> Non
     assert "research" not in result.output
     assert "hoho" not in result.output
 
+    result = runner.invoke(cli, ["list", "--grep", "cancer"])
+    assert not result.exception
+    assert "research" in result.output
+    assert "fun" not in result.output
+    assert "hoho" not in result.output
+
 
 def test_filtering_lists(
     tmpdir: py.path.local, runner: CliRunner, create: Callable
@@ -288,3 +295,26 @@ def test_statuses(todo_factory: Callable, todos: Callable) -> None:
     assert {t.uid for t in completed_todos} == {completed}
     assert {t.uid for t in in_process_todos} == {in_process}
     assert {t.uid for t in needs_action_todos} == {needs_action, no_status}
+
+
+def test_limit(todo_factory: Callable, todos: Callable) -> None:
+    todo_factory(summary="low", priority=9)
+    todo_factory(summary="high", priority=1)
+    todo_factory(summary="medium", priority=5)
+
+    assert [t.summary for t in todos(limit=2)] == ["low", "medium"]
+    assert [t.summary for t in todos(limit=0)] == []
+
+
+def test_completed(todo_factory: Callable, todos: Callable) -> None:
+    todo_factory(summary="cancelled", status="CANCELLED")
+    todo_factory(summary="completed", status="COMPLETED")
+    todo_factory(summary="pending")
+    todo_factory(summary="pending but done", completed_at=datetime.now(tzlocal()))
+
+    assert {t.summary for t in todos(status="ANY", completed=True)} == {
+        "cancelled",
+        "completed",
+        "pending but done",
+    }
+    assert {t.summary for t in todos(status="ANY", completed=False)} == {"pending"}
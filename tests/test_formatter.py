@@ -4,11 +4,13 @@ from datetime import date
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
+from datetime import timezone
 from typing import Callable
 
 import pytest
 import pytz
 from click.testing import CliRunner
+from dateutil.tz import tzlocal
 from freezegun import freeze_time
 
 from tests.helpers import pyicu_sensitive
@@ -16,6 +18,7 @@ from todoman.cli import cli
 from todoman.formatters import DefaultFormatter
 from todoman.formatters import HumanizedFormatter
 from todoman.formatters import rgb_to_ansi
+from todoman.model import Todo
 
 
 @pyicu_sensitive
@@ -105,6 +108,33 @@ def test_format_datetime(default_formatter: DefaultFormatter) -> None:
     )
 
 
+def test_format_equal_datetimes_in_different_timezones() -> None:
+    formatter = DefaultFormatter(date_format="%d/%m/%Y")
+    utc = datetime(2017, 3, 4, 16, 00, tzinfo=pytz.utc)
+    cet = utc.astimezone(pytz.timezone("CET"))
+
+    assert formatter.format_datetime(utc) == "04/03/2017 16:00"
+    assert formatter.format_datetime(cet) == "04/03/2017 17:00"
+
+
+def test_format_same_instant_in_local_and_other_timezone() -> None:
+    formatter = DefaultFormatter(date_format="%d/%m/%Y")
+    local = datetime(2017, 3, 4, 17, 00, tzinfo=tzlocal())
+    offset = local.utcoffset()
+    assert offset is not None
+    other = local.astimezone(timezone(offset + timedelta(hours=1)))
+
+    assert formatter.format_datetime(local) == "04/03/2017 17:00"
+    assert formatter.format_datetime(other) == "04/03/2017 18:00"
+
+
+def test_format_datetime_with_timezone_directive() -> None:
+    formatter = DefaultFormatter(time_format="%H:%M %z")
+    dt = datetime(2017, 3, 4, 17, 00, tzinfo=tzlocal())
+
+    assert formatter.format_datetime(dt) == dt.strftime("%Y-%m-%d %H:%M %z")
+
+
 def test_detailed_format(runner: CliRunner, todo_factory: Callable) -> None:
     todo_factory(
         description=(
@@ -170,6 +200,26 @@ def test_humanized_parse_datetime(humanized_formatter: HumanizedFormatter) -> No
     assert humanized_formatter.format_datetime(None) == ""
 
 
+def test_due_colour_follows_now(default_formatter: DefaultFormatter) -> None:
+    tz = pytz.timezone("CET")
+    todo = Todo()
+    todo.due = datetime(2017, 3, 6, 12).replace(tzinfo=tz)
+
+    default_formatter.now = datetime(2017, 3, 6, 18).replace(tzinfo=tz)
+    assert default_formatter._due_colour(todo) == "red"
+
+    default_formatter.now = datetime(2017, 3, 6, 6).replace(tzinfo=tz)
+    assert default_formatter._due_colour(todo) == "yellow"
+
+    default_formatter.now = datetime(2017, 3, 4, 6).replace(tzinfo=tz)
+    assert default_formatter._due_colour(todo) == "white"
+
+    todo.due = date(2017, 3, 4)
+    assert default_formatter._due_colour(todo) == "red"
+    todo.due = date(2017, 3, 5)
+    assert default_formatter._due_colour(todo) == "white"
+
+
 def test_simple_action(
     default_formatter: DefaultFormatter,
     todo_factory: Callable,
@@ -194,6 +244,8 @@ def test_rgb_to_ansi() -> None:
     assert rgb_to_ansi("#8ab6d2f") == "\x1b[38;2;138;182;210m"
     assert rgb_to_ansi("red") is None
     assert rgb_to_ansi("#8ab6d2") == "\x1b[38;2;138;182;210m"
+    assert rgb_to_ansi("#8ab6zz") is None
+    assert rgb_to_ansi("#+1 2 3") is None
 
 
 def test_format_multiple_with_list(
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from datetime import datetime
 from datetime import timedelta
@@ -17,6 +18,7 @@ from dateutil.tz.tz import tzoffset
 from freezegun import freeze_time
 
 from todoman.exceptions import AlreadyExistsError
+from todoman.exceptions import NoSuchTodoError
 from todoman.model import Database
 from todoman.model import Todo
 from todoman.model import TodoList
@@ -86,6 +88,25 @@ def test_change_paths(tmpdir: py.path.local, create: Callable) -> None:
     assert not list(db.todos())
 
 
+@pytest.mark.parametrize("threshold", [0, float("inf")])
+def test_update_cache_concurrent_scan(
+    tmpdir: py.path.local,
+    create: Callable,
+    threshold: float,
+) -> None:
+    summaries = set("abcde")
+    for x in summaries:
+        create(f"{x}.ics", f"UID:{uuid4()}\nSUMMARY:{x}\n", x)
+
+    with patch("todoman.model._CONCURRENT_SCAN_THRESHOLD", threshold), patch(
+        "todoman.model.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+    ) as executor:
+        db = Database([tmpdir.join(x) for x in summaries], tmpdir.join("cache.sqlite"))
+
+    assert {t.summary for t in db.todos()} == summaries
+    assert executor.called == (threshold == 0)
+
+
 def test_list_displayname(tmpdir: py.path.local) -> None:
     tmpdir.join("default").mkdir()
     with tmpdir.join("default").join("displayname").open("w") as f:
@@ -550,3 +571,35 @@ def test_todo_path_without_list(tmpdir: py.path.local) -> None:
 
     with pytest.raises(ValueError, match="A todo without a list does not have a path."):
         todo.path  # noqa: B018  # expression raises
+
+
+def test_transaction_commits_once(
+    default_database: Database,
+    todo_factory: Callable,
+) -> None:
+    first = todo_factory(summary="first")
+    second = todo_factory(summary="second")
+
+    with patch.object(
+        default_database.cache, "save_to_disk"
+    ) as save_to_disk, default_database.transaction():
+        first.complete()
+        default_database.save(first)
+        second.complete()
+        default_database.save(second)
+
+        assert not save_to_disk.called
+
+    assert save_to_disk.call_count == 1
+
+
+def test_todos_by_ids(default_database: Database, todo_factory: Callable) -> None:
+    todo_factory(summary="first")
+    todo_factory(summary="second")
+    todo_factory(summary="third")
+
+    todos = default_database.todos_by_ids([3, 1, 3])
+    assert [todo.summary for todo in todos] == ["third", "first", "third"]
+
+    with pytest.raises(NoSuchTodoError):
+        default_database.todos_by_ids([1, 4])
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-import functools
 import glob
 import locale
+import os
+import re
 import sys
 from contextlib import contextmanager
 from datetime import date
 from datetime import timedelta
+from fnmatch import translate
+from functools import lru_cache
 from os.path import isdir
 from typing import Callable
+from typing import Iterable
 from typing import Iterator
 from typing import Literal
+from typing import NoReturn
 from typing import ParamSpec
 from typing import TypeVar
 
@@ -21,7 +26,6 @@ from todoman import exceptions
 from todoman import formatters
 from todoman.configuration import ConfigurationError
 from todoman.configuration import load_config
-from todoman.interactive import TodoEditor
 from todoman.model import Database
 from todoman.model import Todo
 from todoman.model import TodoList
@@ -30,38 +34,113 @@ from todoman.model import cached_property
 click_log.basic_config()
 
 
-@contextmanager
-def handle_error() -> Iterator[None]:
-    try:
-        yield
-    except exceptions.TodomanError as e:
-        click.echo(e)
-        sys.exit(e.EXIT_CODE)
+def _exit_with_error(e: exceptions.TodomanError) -> NoReturn:
+    click.echo(e)
+    sys.exit(e.EXIT_CODE)
 
 
 _T = TypeVar("_T")
 _P = ParamSpec("_P")
 
 
+def _copy_meta(src: Callable, dst: Callable[_P, _T]) -> Callable[_P, _T]:
+    """
+    Copy the metadata that click needs from a wrapped command to its wrapper.
+
+    This is a slimmer version of ``functools.wraps``. Note that ``__dict__``
+    must be carried over since it holds the parameters declared by decorators
+    applied to the wrapped function.
+    """
+    dst.__name__ = src.__name__
+    dst.__doc__ = src.__doc__
+    dst.__dict__.update(src.__dict__)
+    return dst
+
+
 def catch_errors(f: Callable[_P, _T]) -> Callable[_P, _T]:
-    @functools.wraps(f)
     def wrapper(*a, **kw) -> _T:
-        with handle_error():
+        try:
             return f(*a, **kw)
+        except exceptions.TodomanError as e:
+            _exit_with_error(e)
 
-    return wrapper
+    return _copy_meta(f, wrapper)
+
+
+def _get_ctx(click_ctx: click.Context) -> AppContext:
+    """
+    Return the AppContext for this invocation.
+
+    The lookup is cached in the context's ``meta`` (which is shared by the whole
+    context chain), so that parameter callbacks don't each walk up the chain.
+    """
+    ctx = click_ctx.meta.get("app_ctx")
+    if ctx is None:
+        ctx = click_ctx.find_object(AppContext)
+        assert ctx, "AppContext must be defined"
+        click_ctx.meta["app_ctx"] = ctx
+    return ctx
 
 
 TODO_ID_MIN = 1
 with_id_arg = click.argument("id", type=click.IntRange(min=TODO_ID_MIN))
 
 
+def _lists_map(ctx: AppContext) -> dict[str, TodoList]:
+    try:
+        return ctx.db.lists_map
+    except exceptions.TodomanError as e:
+        _exit_with_error(e)
+
+
+def _find_list(lists: dict[str, TodoList], name: str) -> TodoList | None:
+    # An exact match is always what case-insensitive matching would pick (or
+    # fall back to, on collisions), so only scan all lists when there is none.
+    exact_match = lists.get(name)
+    if exact_match is not None:
+        return exact_match
+
+    lowered = name.lower()
+    fuzzy_matches = [list_ for list_ in lists.values() if list_.name.lower() == lowered]
+
+    if len(fuzzy_matches) == 1:
+        return fuzzy_matches[0]
+
+    return None
+
+
+def _unknown_lists_error(
+    names: Iterable[str],
+    lists: dict[str, TodoList],
+) -> click.BadParameter:
+    return click.BadParameter(
+        "{}. Available lists are: {}".format(
+            ", ".join(names), ", ".join(list_.name for list_ in lists.values())
+        )
+    )
+
+
 def _validate_lists_param(
-    ctx: click.Context,
+    click_ctx: click.Context,
     param: click.Parameter,
     lists: list[str],
 ) -> list[TodoList]:
-    return [_validate_list_param(ctx, param, name=list_) for list_ in lists]
+    if not lists:
+        return []
+
+    lists_map = _lists_map(_get_ctx(click_ctx))
+    found = {}
+    missing = []
+    for name in lists:
+        list_ = _find_list(lists_map, name)
+        if list_ is None:
+            missing.append(name)
+        else:
+            found[list_.name] = list_
+
+    if missing:
+        raise _unknown_lists_error(missing, lists_map)
+    return list(found.values())
 
 
 def _validate_list_param(
@@ -69,30 +148,18 @@ def _validate_list_param(
     param: click.Parameter,
     name: str,
 ) -> TodoList:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
+    ctx = _get_ctx(click_ctx)
     if name is None:
         if ctx.config["default_list"]:
             name = ctx.config["default_list"]
         else:
             raise click.BadParameter("You must set `default_list` or use -l.")
-    lists = {list_.name: list_ for list_ in ctx.db.lists()}
-    fuzzy_matches = [
-        list_ for list_ in lists.values() if list_.name.lower() == name.lower()
-    ]
-
-    if len(fuzzy_matches) == 1:
-        return fuzzy_matches[0]
 
-    # case-insensitive matching collides or does not find a result,
-    # use exact matching
-    if name in lists:
-        return lists[name]
-    raise click.BadParameter(
-        "{}. Available lists are: {}".format(
-            name, ", ".join(list_.name for list_ in lists.values())
-        )
-    )
+    lists_map = _lists_map(ctx)
+    list_ = _find_list(lists_map, name)
+    if list_ is None:
+        raise _unknown_lists_error([name], lists_map)
+    return list_
 
 
 def _validate_date_param(
@@ -100,8 +167,7 @@ def _validate_date_param(
     param: click.Parameter,
     val: str,
 ) -> date | None:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
+    ctx = _get_ctx(click_ctx)
     try:
         return ctx.formatter.parse_datetime(val)
     except ValueError as e:
@@ -113,8 +179,7 @@ def _validate_categories_param(
     param: click.Parameter,
     val: str,
 ) -> list[str]:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
+    ctx = _get_ctx(click_ctx)
     return ctx.formatter.parse_categories(val)
 
 
@@ -123,8 +188,7 @@ def _validate_priority_param(
     param: click.Parameter,
     val: str,
 ) -> int | None:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
+    ctx = _get_ctx(click_ctx)
     try:
         return ctx.formatter.parse_priority(val)
     except ValueError as e:
@@ -136,8 +200,7 @@ def _validate_start_date_param(
     param: click.Parameter,
     val: str,
 ) -> tuple[bool, date] | None:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
+    ctx = _get_ctx(click_ctx)
     if not val:
         return None
 
@@ -160,8 +223,7 @@ def _validate_startable_param(
     param: click.Parameter,
     val: bool,
 ) -> bool:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
+    ctx = _get_ctx(click_ctx)
     return val or ctx.config["startable"]
 
 
@@ -170,10 +232,17 @@ def _validate_todos(
     param: click.Parameter,
     val: list[int],
 ) -> list[Todo]:
-    ctx = click_ctx.find_object(AppContext)
-    assert ctx, "AppContext must be defined"
-    with handle_error():
-        return [ctx.db.todo(int(id)) for id in val]
+    ctx = _get_ctx(click_ctx)
+    try:
+        return ctx.db.todos_by_ids(int(id) for id in val)
+    except exceptions.TodomanError as e:
+        _exit_with_error(e)
+
+
+# Number of lines the list command writes out at a time.
+_LIST_BATCH_SIZE = 256
+
+_SORTABLE_FIELDS = frozenset((*Todo.ALL_SUPPORTED_FIELDS, "id"))
 
 
 def _sort_callback(ctx: click.Context, param: click.Parameter, val: str) -> list[str]:
@@ -182,12 +251,15 @@ def _sort_callback(ctx: click.Context, param: click.Parameter, val: str) -> list
         if field.startswith("-"):
             field = field[1:]
 
-        if field not in Todo.ALL_SUPPORTED_FIELDS and field != "id":
+        if field not in _SORTABLE_FIELDS:
             raise click.BadParameter(f"Unknown field '{field}'")
 
     return fields
 
 
+_VALID_STATUSES = frozenset(Todo.VALID_STATUSES)
+
+
 def validate_status(ctx: AppContext, param: click.Parameter, val: str) -> str:
     statuses = val.upper().split(",")
 
@@ -195,7 +267,7 @@ def validate_status(ctx: AppContext, param: click.Parameter, val: str) -> str:
         return ",".join(Todo.VALID_STATUSES)
 
     for status in statuses:
-        if status not in Todo.VALID_STATUSES:
+        if status not in _VALID_STATUSES:
             raise click.BadParameter(
                 'Invalid status, "{}", statuses must be one of "{}", or "ANY"'.format(
                     status, ", ".join(Todo.VALID_STATUSES)
@@ -238,25 +310,60 @@ def _todo_property_options(command: Callable) -> Callable:
         help="When the task starts.",
     )(command)
 
-    @functools.wraps(command)
-    def command_wrap(*a, **kw) -> click.Command:
+    def command_wrap(
+        *a,
+        due: date | None,
+        start: date | None,
+        location: str | None,
+        priority: int | None,
+        category: list[str],
+        **kw,
+    ) -> click.Command:
         kw["todo_properties"] = {
-            key: kw.pop(key) for key in ("due", "start", "location", "priority")
+            "due": due,
+            "start": start,
+            "location": location,
+            "priority": priority,
+            # longform is singular since user can pass it multiple times, but
+            # in actuality it's plural, so manually changing for #cache.todos.
+            "categories": category,
         }
-        # longform is singular since user can pass it multiple times, but
-        # in actuality it's plural, so manually changing for #cache.todos.
-        kw["todo_properties"]["categories"] = kw.pop("category")
 
         return command(*a, **kw)
 
-    return command_wrap
+    return _copy_meta(command, command_wrap)
 
 
 class AppContext:
     config: dict  # TODO: better typing
-    db: Database
+    paths: list[str]
     formatter_class: type[formatters.Formatter]
 
+    _db: Database | None = None
+    _db_is_fresh = False
+
+    @property
+    def db(self) -> Database:
+        # Opened lazily, so that commands which never touch it (e.g. when
+        # showing a subcommand's --help) don't pay for loading the cache.
+        cache_path = self.config["cache_path"]
+        if self._db is None or self._db.cache.cache_path != cache_path:
+            self._db = Database(self.paths, cache_path)
+        elif not self._db_is_fresh:
+            self._db.paths = self.paths
+            self._db.update_cache()
+        self._db_is_fresh = True
+        return self._db
+
+    def expire_db(self) -> None:
+        """
+        Refresh the database on its next use.
+
+        In the repl, the same context is used for all commands. This keeps the
+        database open between them, while still picking up changes on disk.
+        """
+        self._db_is_fresh = False
+
     @cached_property
     def ui_formatter(self) -> formatters.Formatter:
         return formatters.DefaultFormatter(
@@ -360,15 +467,12 @@ def cli(
     elif colour == "never":
         click_ctx.color = False
 
-    paths = [
-        path
-        for path in glob.iglob(ctx.config["path"])
-        if isdir(path) and not path.endswith("__pycache__")
-    ]
-    if len(paths) == 0:
-        raise exceptions.NoListsFoundError(ctx.config["path"])
-
-    ctx.db = Database(paths, ctx.config["cache_path"])
+    # Already expanded by load_config.
+    path_pattern = ctx.config["path"]
+    ctx.paths = _find_list_dirs(path_pattern)
+    if len(ctx.paths) == 0:
+        raise exceptions.NoListsFoundError(path_pattern)
+    ctx.expire_db()
 
     # Make python actually use LC_TIME, or the user's locale settings
     locale.setlocale(locale.LC_TIME, "")
@@ -380,16 +484,58 @@ def cli(
         )
 
 
+_has_magic = re.compile("[*?[]").search
+
+
+def _find_list_dirs(pattern: str) -> list[str]:
+    """
+    Return all directories matching ``pattern``.
+
+    Patterns are usually of the form ``~/calendars/*``, where only the last
+    component has wildcards. That case is handled with a single ``scandir`` of
+    the parent directory, and a pattern with no wildcards at all with a single
+    ``stat``. Everything else falls back to ``glob``.
+    """
+    parent, _, tail = pattern.rpartition(os.sep)
+    if not _has_magic(pattern):
+        paths = [pattern] if isdir(pattern) else []
+    elif parent and not _has_magic(parent) and _has_magic(tail):
+        match = _compile_pattern(tail)
+        try:
+            with os.scandir(parent) as entries:
+                paths = [
+                    entry.path
+                    for entry in entries
+                    # Like glob, only match hidden entries explicitly.
+                    if (tail.startswith(".") or not entry.name.startswith("."))
+                    and match(entry.name)
+                    and entry.is_dir()
+                ]
+        except OSError:
+            return []
+    else:
+        paths = [path for path in glob.iglob(pattern) if isdir(path)]
+
+    return [path for path in paths if not path.endswith("__pycache__")]
+
+
+@lru_cache(maxsize=8)
+def _compile_pattern(pattern: str) -> Callable[[str], re.Match | None]:
+    """Return a case-sensitive matcher for a single glob path component."""
+    return re.compile(translate(pattern)).match
+
+
 def invoke_command(click_ctx: click.Context, command: str) -> None:
     name, *raw_args = command.split(" ")
-    if name not in cli.commands:
+    subcommand = cli.commands.get(name)
+    if subcommand is None:
         raise click.ClickException("Invalid setting for [default_command]")
-    parser = cli.commands[name].make_parser(click_ctx)
+    parser = subcommand.make_parser(click_ctx)
     opts, args, param_order = parser.parse_args(raw_args)
     for param in param_order:
         if param.name:
             opts[param.name] = param.handle_parse_result(click_ctx, opts, args)[0]
-    click_ctx.invoke(cli.commands[name], *args, **opts)
+    click_ctx.invoke(subcommand, *args, **opts)
 
 
 @cli.command()
@@ -405,6 +551,10 @@ def repl(ctx: click.Context) -> None:
         sys.exit(-1)
 
 
+# click_repl is only imported when the shell is actually started.
+cli.add_command(repl, name="shell")
+
+
 @cli.command()
 @click.argument("summary", nargs=-1)
 @click.option(
@@ -456,6 +606,9 @@ def new(
         todo.description = "\n".join(sys.stdin)
 
     if interactive or (not summary and interactive is None):
+        # Imported here since urwid is slow to import, and only needed here.
+        from todoman.interactive import TodoEditor
+
         ui = TodoEditor(todo, ctx.db.lists(), ctx.ui_formatter)
         ui.edit()
         click.echo()  # work around lines going missing after urwid
@@ -504,16 +657,20 @@ def edit(
             setattr(todo, key, value)
 
     if interactive or (not changes and interactive is None):
+        from todoman.interactive import TodoEditor
+
         ui = TodoEditor(todo, ctx.db.lists(), ctx.ui_formatter)
         ui.edit()
 
-    # This little dance avoids duplicates when changing the list:
     new_list = todo.list
     assert new_list, "New list cannot be None"
     assert old_list, "Original list cannot be None"
-    todo.list = old_list
-    ctx.db.save(todo)
-    if old_list != new_list:
+    if new_list == old_list:
+        ctx.db.save(todo)
+    else:
+        # This little dance avoids duplicates when changing the list:
+        todo.list = old_list
+        ctx.db.save(todo)
         ctx.db.move(todo, new_list=new_list, from_list=old_list)
     click.echo(ctx.formatter.detailed(todo))
 
@@ -540,6 +697,22 @@ def path(ctx: AppContext, id: int) -> None:
     click.echo(todo.path)
 
 
+@contextmanager
+def _echo_lines() -> Iterator[list[str]]:
+    """
+    Collects output lines, and writes them all at once.
+
+    Lines collected before an error are still written, so that changes which
+    were already saved get reported.
+    """
+    lines: list[str] = []
+    try:
+        yield lines
+    finally:
+        if lines:
+            click.echo("\n".join(lines))
+
+
 @cli.command()
 @pass_ctx
 @click.argument(
@@ -552,10 +725,11 @@ def path(ctx: AppContext, id: int) -> None:
 @catch_errors
 def done(ctx: AppContext, todos: list[Todo]) -> None:
     """Mark one or more tasks as done."""
-    for todo in todos:
-        todo.complete()
-        ctx.db.save(todo)
-        click.echo(ctx.formatter.detailed(todo))
+    with _echo_lines() as lines, ctx.db.transaction():
+        for todo in todos:
+            todo.complete()
+            ctx.db.save(todo)
+            lines.append(ctx.formatter.detailed(todo))
 
 
 @cli.command()
@@ -570,10 +744,11 @@ def done(ctx: AppContext, todos: list[Todo]) -> None:
 @catch_errors
 def cancel(ctx: AppContext, todos: list[Todo]) -> None:
     """Cancel one or more tasks."""
-    for todo in todos:
-        todo.cancel()
-        ctx.db.save(todo)
-        click.echo(ctx.formatter.detailed(todo))
+    with _echo_lines() as lines, ctx.db.transaction():
+        for todo in todos:
+            todo.cancel()
+            ctx.db.save(todo)
+            lines.append(ctx.formatter.detailed(todo))
 
 
 @cli.command()
@@ -584,9 +759,9 @@ def flush(ctx: AppContext) -> None:
     """
     Delete done tasks. This will also clear the cache to reset task IDs.
     """
-    database = ctx.db
-    for todo in database.flush():
-        click.echo(ctx.formatter.simple_action("Flushing", todo))
+    lines = [ctx.formatter.simple_action("Flushing", todo) for todo in ctx.db.flush()]
+    if lines:
+        click.echo("\n".join(lines))
 
 
 @cli.command()
@@ -603,18 +778,16 @@ def delete(ctx: AppContext, ids: list[int], yes: bool) -> None:
     the actual task around.
     """
 
-    todos = []
-    for i in ids:
-        todo = ctx.db.todo(i)
-        click.echo(ctx.formatter.compact(todo))
-        todos.append(todo)
+    todos = ctx.db.todos_by_ids(ids)
+    click.echo("\n".join(ctx.formatter.compact(todo) for todo in todos))
 
     if not yes:
         click.confirm("Do you want to delete those tasks?", abort=True)
 
-    for todo in todos:
-        click.echo(ctx.formatter.simple_action("Deleting", todo))
-        ctx.db.delete(todo)
+    with _echo_lines() as lines:
+        for todo in todos:
+            lines.append(ctx.formatter.simple_action("Deleting", todo))
+            ctx.db.delete(todo)
 
 
 @cli.command()
@@ -627,12 +800,12 @@ def delete(ctx: AppContext, ids: list[int], yes: bool) -> None:
 def copy(ctx: AppContext, list: TodoList, ids: list[int]) -> None:
     """Copy tasks to another list."""
 
-    for id in ids:
-        original = ctx.db.todo(id)
-        todo = original.clone()
-        todo.list = list
-        click.echo(ctx.formatter.compact(todo))
-        ctx.db.save(todo)
+    with _echo_lines() as lines, ctx.db.transaction():
+        for original in ctx.db.todos_by_ids(ids):
+            todo = original.clone()
+            todo.list = list
+            lines.append(ctx.formatter.compact(todo))
+            ctx.db.save(todo)
 
 
 @cli.command()
@@ -645,18 +818,20 @@ def copy(ctx: AppContext, list: TodoList, ids: list[int]) -> None:
 def move(ctx: AppContext, list: TodoList, ids: list[int]) -> None:
     """Move tasks to another list."""
 
-    for id in ids:
-        todo = ctx.db.todo(id)
-        click.echo(ctx.formatter.compact(todo))
-        assert todo.list, "Source todo must have a list"
-        ctx.db.move(todo, new_list=list, from_list=todo.list)
+    with _echo_lines() as lines:
+        for todo in ctx.db.todos_by_ids(ids):
+            lines.append(ctx.formatter.compact(todo))
+            assert todo.list, "Source todo must have a list"
+            ctx.db.move(todo, new_list=list, from_list=todo.list)
 
 
 @cli.command(name="list")
 @pass_ctx
 @click.argument("lists", nargs=-1, callback=_validate_lists_param)
 @click.option("--location", help="Only show tasks with location containg TEXT")
-@click.option("--grep", help="Only show tasks with message containg TEXT")
+@click.option(
+    "--grep", help="Only show tasks with a summary or description containing TEXT"
+)
 @click.option(
     "--sort",
     help=(
@@ -675,6 +850,12 @@ def move(ctx: AppContext, list: TodoList, ids: list[int]) -> None:
 @click.option(
     "--due", default=None, help="Only show tasks due in INTEGER hours", type=int
 )
+@click.option(
+    "--limit",
+    default=None,
+    help="Only show the first INTEGER tasks (after sorting).",
+    type=click.IntRange(min=0),
+)
 @click.option(
     "--category",
     "-c",
@@ -740,9 +921,19 @@ def list_command(ctx: AppContext, *args, **kwargs) -> None:
     The following commands can further filter shown todos, or include those
     omited by default:
     """
-    hide_list = (len(list(ctx.db.lists())) == 1) or (len(kwargs["lists"]) == 1)
+    hide_list = (len(ctx.db.lists_map) == 1) or (len(kwargs["lists"]) == 1)
 
     kwargs["categories"] = kwargs.pop("category")
 
     todos = ctx.db.todos(**kwargs)
-    click.echo(ctx.formatter.compact_multiple(todos, hide_list))
+    # click.echo() flushes on every call, so write lines out in batches.
+    batch: list[str] = []
+    empty = True
+    for line in ctx.formatter.compact_lines(todos, hide_list):
+        batch.append(line)
+        empty = False
+        if len(batch) == _LIST_BATCH_SIZE:
+            click.echo("\n".join(batch))
+            batch.clear()
+    if batch or empty:
+        click.echo("\n".join(batch))
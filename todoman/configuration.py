@@ -1,16 +1,18 @@
 from __future__ import annotations
 
+import ast
 import os
+import re
+from functools import lru_cache
 from importlib.util import module_from_spec
 from importlib.util import spec_from_file_location
 from os.path import exists
 from os.path import join
+from types import SimpleNamespace
 from typing import Any
 from typing import Callable
 from typing import NamedTuple
 
-import xdg.BaseDirectory
-
 from todoman import __documentation__
 
 
@@ -20,12 +22,20 @@ def expand_path(path: str) -> str:
 
 
 def validate_cache_path(path: str) -> str:
-    path = path.replace("$XDG_CACHE_HOME", xdg.BaseDirectory.xdg_cache_home)
+    if "$XDG_CACHE_HOME" in path:
+        # xdg is only imported when needed, since it's not needed for every run.
+        import xdg.BaseDirectory
+
+        path = path.replace("$XDG_CACHE_HOME", xdg.BaseDirectory.xdg_cache_home)
     return expand_path(path)
 
 
+_TIME_DIRECTIVES = re.compile("%[HMSX]")
+_DATE_DIRECTIVES = re.compile("%[Yymdx]")
+
+
 def validate_date_format(fmt: str) -> str:
-    if any(x in fmt for x in ("%H", "%M", "%S", "%X")):
+    if _TIME_DIRECTIVES.search(fmt):
         raise ConfigurationError(
             "Found time component in `date_format`, please use `time_format` for that."
         )
@@ -33,15 +43,18 @@ def validate_date_format(fmt: str) -> str:
 
 
 def validate_time_format(fmt: str) -> str:
-    if any(x in fmt for x in ("%Y", "%y", "%m", "%d", "%x")):
+    if _DATE_DIRECTIVES.search(fmt):
         raise ConfigurationError(
             "Found date component in `time_format`, please use `date_format` for that."
         )
     return fmt
 
 
+_COLOR_SETTINGS = frozenset(("always", "auto", "never"))
+
+
 def validate_color_config(value: str) -> str:
-    if value not in ["always", "auto", "never"]:
+    if value not in _COLOR_SETTINGS:
         raise ConfigurationError("Invalid `color` settings.")
     return value
 
@@ -194,57 +207,119 @@ Highest priority is 1, lowest priority is 10, and 0 means no priority at all.
 ]
 
 
+_CONFIGURATION_HELP = (
+    "\nFor details on the configuration format and a sample file, "
+    f"see\n{__documentation__}configure.html"
+)
+
+
 class ConfigurationError(Exception):
     def __init__(self, msg: str) -> None:
-        super().__init__(
-            f"{msg}\nFor details on the configuration format and a sample file, "
-            f"see\n{__documentation__}configure.html"
-        )
+        super().__init__(msg + _CONFIGURATION_HELP)
 
 
 def find_config(config_path: str | None = None) -> str:
-    if not config_path:
-        for d in xdg.BaseDirectory.xdg_config_dirs:
-            path = join(d, "todoman", "config.py")
-            if exists(path):
-                config_path = path
-                break
+    if config_path:
+        if not exists(config_path):
+            raise ConfigurationError(
+                f"Configuration file {config_path} does not exist.\n"
+            )
+        return config_path
+
+    import xdg.BaseDirectory
+
+    for d in xdg.BaseDirectory.xdg_config_dirs:
+        path = join(d, "todoman", "config.py")
+        if exists(path):
+            return path
 
-    if not config_path:
-        raise ConfigurationError("No configuration file found.\n\n")
-    if not exists(config_path):
-        raise ConfigurationError(f"Configuration file {config_path} does not exist.\n")
-    return config_path
+    raise ConfigurationError("No configuration file found.\n\n")
 
 
 def load_config(custom_path: str | None = None) -> dict:
     path = find_config(custom_path)
-    spec = spec_from_file_location("config", path)
-    if not spec or not spec.loader:
-        raise ConfigurationError("Failed to parse file as spec")
-    config_source = module_from_spec(spec)
+    stat = os.stat(path)
+    # Return a copy, so callers can't alter the memoised configuration.
+    return dict(_load_config(path, stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=4)
+def _load_config(path: str, mtime: int, size: int) -> dict:
+    """
+    Load and validate the configuration file at ``path``.
 
-    spec.loader.exec_module(config_source)
+    This is memoised on the file's ``mtime`` and ``size``, so that running
+    multiple commands in one process (e.g.: in the repl) doesn't re-execute an
+    unchanged file each time.
+    """
+    config_source: object | None = _read_literal_config(path)
+    if config_source is None:
+        spec = spec_from_file_location("config", path)
+        if not spec or not spec.loader:
+            raise ConfigurationError("Failed to parse file as spec")
+        config_source = module_from_spec(spec)
 
-    # TODO: Handle SyntaxError
+        spec.loader.exec_module(config_source)
 
+        # TODO: Handle SyntaxError
+
+    settings = vars(config_source)
     config = {}
     for name, type_, default, _description, validation in CONFIG_SPEC:
-        value = getattr(config_source, name, default)
-        if value == NO_DEFAULT:
+        value = settings.get(name, default)
+        if value is NO_DEFAULT:
             raise ConfigurationError(f"Missing '{name}' setting.")
-        if not isinstance(value, type_):
-            if isinstance(type_, tuple):
-                expected = ",".join([t.__name__ for t in type_])
-            else:
-                expected = type_.__name__
-            actual = value.__class__.__name__
-            raise ConfigurationError(
-                f"Bad {name} setting. Invalid type "
-                f"(expected {expected}, got {actual})."
-            )
+        # Most values are exactly of the expected type; skip isinstance for those.
+        # bool is a subclass of int, but is never a valid integer setting.
+        if type(value) is not type_ and (
+            not isinstance(value, type_) or isinstance(value, bool)
+        ):
+            raise _invalid_type_error(name, type_, value)
         if validation:
             value = validation(value)
         config[name] = value
 
     return config
+
+
+def _invalid_type_error(
+    name: str, type_: type | tuple[type, ...], value: object
+) -> ConfigurationError:
+    if isinstance(type_, tuple):
+        expected = ",".join([t.__name__ for t in type_])
+    else:
+        expected = type_.__name__
+    actual = value.__class__.__name__
+    return ConfigurationError(
+        f"Bad {name} setting. Invalid type (expected {expected}, got {actual})."
+    )
+
+
+def _read_literal_config(path: str) -> SimpleNamespace | None:
+    """
+    Read the settings from ``path`` without executing it.
+
+    Most configuration files only assign literals to names, and this handles
+    exactly those. ``None`` is returned for any other file, which then needs
+    to be executed as a Python module.
+    """
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), path)
+    except SyntaxError:
+        return None
+
+    settings = {}
+    for node in tree.body:
+        if not (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+        ):
+            return None
+        try:
+            settings[node.targets[0].id] = ast.literal_eval(node.value)
+        except (ValueError, TypeError):
+            return None
+
+    return SimpleNamespace(**settings)
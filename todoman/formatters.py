@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import contextlib
 import json
+import re
 from abc import ABC
 from abc import abstractmethod
 from datetime import date
@@ -9,18 +10,22 @@ from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
 from datetime import tzinfo
+from functools import cached_property
+from functools import lru_cache
 from time import mktime
 from typing import Iterable
+from typing import Iterator
 
 import click
 import humanize
 import parsedatetime
-from dateutil.tz import tzlocal
 
+from todoman.model import LOCAL_TIMEZONE
 from todoman.model import Todo
 from todoman.model import TodoList
 
 
+@lru_cache(maxsize=64)
 def rgb_to_ansi(colour: str | None) -> str | None:
     """
     Convert a string containing an RGB colour to ANSI escapes
@@ -28,12 +33,172 @@ def rgb_to_ansi(colour: str | None) -> str | None:
     if not colour or not colour.startswith("#"):
         return None
 
-    r, g, b = colour[1:3], colour[3:5], colour[5:7]
+    rgb = colour[1:7]
 
-    if not len(r) == len(g) == len(b) == 2:
+    # Any trailing alpha channel is ignored.
+    if len(rgb) != 6:
         return None
+    # int() would also accept signs, underscores and whitespace.
+    if not rgb.isalnum():
+        return None
+    try:
+        value = int(rgb, 16)
+    except ValueError:
+        return None
+
+    return f"\33[38;2;{value >> 16};{(value >> 8) & 0xFF};{value & 0xFF}m"
+
+
+# The escape codes click.style() would emit for the colours used in compact
+# output, built once since it's otherwise called several times per todo.
+_STYLE_RESET = click.style("", reset=True)
+_FOREGROUNDS = {
+    colour: click.style("", fg=colour, reset=False)
+    for colour in ("magenta", "red", "white", "yellow")
+}
+
+
+_PRIORITY_VALUES = {"low": 9, "medium": 5, "high": 4, "none": 0}
+# Names and compact marks for each valid priority, where 0 means no priority.
+_PRIORITY_NAMES = {
+    0: "none",
+    **dict.fromkeys(range(1, 5), "high"),
+    5: "medium",
+    **dict.fromkeys(range(6, 10), "low"),
+}
+_PRIORITY_MARKS = {
+    0: "",
+    **dict.fromkeys(range(1, 5), "!!!"),
+    5: "!!",
+    **dict.fromkeys(range(6, 10), "!"),
+}
+
+
+# Patterns matching at least everything strptime() accepts for these directives.
+_DIRECTIVE_PATTERNS = {
+    "Y": r"(?P<Y>\d{4})",
+    "y": r"(?P<y>\d{2})",
+    "m": r"(?P<m>\d{1,2})",
+    "d": r"(?P<d>[ \d]?\d)",
+    "H": r"(?P<H>\d{1,2})",
+    "M": r"(?P<M>\d{1,2})",
+    "S": r"(?P<S>\d{1,2})",
+    "%": "%",
+}
+
+
+@lru_cache(maxsize=16)
+def _strptime_pattern(fmt: str) -> re.Pattern | None:
+    """
+    Returns a pattern matching any string which strptime() may parse with fmt.
+
+    Returns None if fmt has directives for which no pattern is known (e.g.:
+    locale-dependant ones).
+    """
+    parts = []
+    chars = iter(fmt)
+    for char in chars:
+        if char == "%":
+            pattern = _DIRECTIVE_PATTERNS.get(next(chars, ""))
+            if pattern is None:
+                return None
+            parts.append(pattern)
+        elif char.isspace():
+            # Like strptime(), match any run of whitespace.
+            if not parts or parts[-1] != r"\s+":
+                parts.append(r"\s+")
+        else:
+            parts.append(re.escape(char))
+    try:
+        return re.compile("".join(parts), re.IGNORECASE)
+    except re.error:  # e.g.: a directive is used twice.
+        return None
+
+
+def _datetime_from_fields(fields: dict[str, str]) -> datetime:
+    """Builds a datetime from fields matched by a _strptime_pattern()."""
+    if "Y" in fields:
+        year = int(fields["Y"])
+    elif "y" in fields:
+        # Same cutoff as strptime().
+        year = int(fields["y"])
+        year += 2000 if year <= 68 else 1900
+    else:
+        year = 1900
+
+    return datetime(
+        year,
+        int(fields.get("m", 1)),
+        int(fields.get("d", 1)),
+        int(fields.get("H", 0)),
+        int(fields.get("M", 0)),
+        int(fields.get("S", 0)),
+    )
+
+
+def _strptime(value: str, fmt: str) -> datetime | None:
+    """
+    Like datetime.strptime(), but returns None if value doesn't match fmt.
+
+    Numeric formats are handled with a precompiled pattern, skipping strptime()
+    (and raising and catching its errors) entirely.
+    """
+    pattern = _strptime_pattern(fmt)
+    if pattern is not None:
+        match = pattern.fullmatch(value)
+        if match is None:
+            return None
+        with contextlib.suppress(ValueError):
+            return _datetime_from_fields(match.groupdict())
+        # The pattern may have split adjacent fields differently than strptime()
+        # would (e.g.: "%m%d"), so let it have the final say.
+
+    try:
+        return datetime.strptime(value, fmt)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_formatted(
+    dt: str,
+    datetime_format: str,
+    date_format: str,
+    time_format: str,
+    today: date,
+) -> date | None:
+    """
+    Parse dt using the given formats, returning None if none of them match.
 
-    return f"\33[38;2;{int(r, 16)!s};{int(g, 16)!s};{int(b, 16)!s}m"
+    This is memoised, since the same few inputs tend to be parsed repeatedly.
+    ``today`` is used for time-only input, and is part of the key so that
+    such results don't outlive the day they were parsed on.
+    """
+    # ISO dates can be parsed with date.fromisoformat(), which is implemented
+    # in C and much cheaper than strptime(). If there's no time format, such
+    # input is parsed as a datetime instead, so skip this.
+    if (
+        date_format == "%Y-%m-%d"
+        and time_format
+        and len(dt) == 10
+        and dt[4] == dt[7] == "-"
+    ):
+        with contextlib.suppress(ValueError):
+            return date.fromisoformat(dt)
+
+    rv = _strptime(dt, datetime_format)
+    if rv is not None:
+        return rv
+
+    rv = _strptime(dt, date_format)
+    if rv is not None:
+        return rv.date()
+
+    rv = _strptime(dt, time_format)
+    if rv is not None:
+        return datetime.combine(today, rv.time())
+
+    return None
 
 
 class Formatter(ABC):
@@ -54,6 +219,16 @@ class Formatter(ABC):
     def compact_multiple(self, todos: Iterable[Todo], hide_list: bool = False) -> str:
         """Same as compact() but for multiple todos."""
 
+    def compact_lines(
+        self, todos: Iterable[Todo], hide_list: bool = False
+    ) -> Iterator[str]:
+        """Same as compact_multiple(), but yields output in chunks.
+
+        Subclasses which can render todos one at a time should override this, so
+        that large listings can be written out without being built in memory.
+        """
+        yield self.compact_multiple(todos, hide_list)
+
     @abstractmethod
     def simple_action(self, action: str, todo: Todo) -> str:
         """Render an action related to a todo (e.g.: compelete, undo, etc)."""
@@ -106,10 +281,27 @@ class DefaultFormatter(Formatter):
             filter(bool, (date_format, time_format))
         )
 
-        self.tz = tz_override or tzlocal()
-        self.now = datetime.now().replace(tzinfo=self.tz)
+        # strftime() is relatively slow, so ISO formats are special-cased.
+        self._iso_date_format = date_format == "%Y-%m-%d"
+        self._iso_datetime_format = self.datetime_format == "%Y-%m-%d %H:%M"
+        # Only these directives make formatted datetimes depend on their tzinfo.
+        self._tz_datetime_format = any(
+            directive in self.datetime_format for directive in ("%z", "%Z")
+        )
 
-        self._parsedatetime_calendar = parsedatetime.Calendar(
+        # Formatted list names, by name and colour.
+        self._list_labels: dict[tuple[str, str | None], str] = {}
+
+        self.tz = tz_override or LOCAL_TIMEZONE
+        self.now = datetime.now().replace(tzinfo=self.tz)
+        # Bounds used by _due_colour(), and the value of `now` they were built for.
+        self._due_bounds_now: datetime | None = None
+        self._due_bounds_cache: tuple[tuple[date, date], tuple[date, date]]
+
+    @cached_property
+    def _parsedatetime_calendar(self) -> parsedatetime.Calendar:
+        # Only needed for input matching none of the formats, and slow to build.
+        return parsedatetime.Calendar(
             version=parsedatetime.VERSION_CONTEXT_STYLE,
         )
 
@@ -120,30 +312,29 @@ class DefaultFormatter(Formatter):
         return self.compact_multiple([todo])
 
     def compact_multiple(self, todos: Iterable[Todo], hide_list: bool = False) -> str:
+        return "\n".join(self.compact_lines(todos, hide_list))
+
+    def compact_lines(
+        self, todos: Iterable[Todo], hide_list: bool = False
+    ) -> Iterator[str]:
         # TODO: format lines fuidly and drop the table
         # it can end up being more readable when too many columns are empty.
         # show dates that are in the future in yellow (in 24hs) or grey (future)
-        table = []
         for todo in todos:
             completed = "X" if todo.is_completed else " "
             percent = todo.percent_complete or ""
             if percent:
                 percent = f" ({percent}%)"
 
-            if todo.categories:
-                categories = " [" + ", ".join(todo.categories) + "]"
-            else:
-                categories = ""
+            categories = f" [{', '.join(todo.categories)}]" if todo.categories else ""
 
-            priority = click.style(
-                self.format_priority_compact(todo.priority),
-                fg="magenta",
+            priority = (
+                f"{_FOREGROUNDS['magenta']}"
+                f"{self.format_priority_compact(todo.priority)}{_STYLE_RESET}"
             )
 
             due = self.format_datetime(todo.due) or "(no due date)"
-            due_colour = self._due_colour(todo)
-            if due_colour:
-                due = click.style(str(due), fg=due_colour)
+            due = f"{_FOREGROUNDS[self._due_colour(todo)]}{due}{_STYLE_RESET}"
 
             recurring = "⟳" if todo.is_recurring else ""
 
@@ -159,21 +350,37 @@ class DefaultFormatter(Formatter):
 
             # FIXME: double space when no priority
             # split into parts to satisfy linter line too long
-            table.append(
+            yield (
                 f"[{completed}] {todo.id} {priority} {due} "
                 f"{recurring}{summary}{categories}"
             )
 
-        return "\n".join(table)
+    def _due_bounds(self) -> tuple[tuple[date, date], tuple[date, date]]:
+        """Returns the due colour bounds for datetimes and dates, respectively."""
+        # `now` may be reassigned, so only reuse bounds built for its current value.
+        if self._due_bounds_now is not self.now:
+            now = self.now
+            today = now.date()
+            self._due_bounds_cache = (
+                (now, now + timedelta(hours=24)),
+                (today, today + timedelta(days=1)),
+            )
+            self._due_bounds_now = now
+        return self._due_bounds_cache
 
     def _due_colour(self, todo: Todo) -> str:
-        now = self.now if isinstance(todo.due, datetime) else self.now.date()
-        if todo.due:
-            if todo.due <= now and not todo.is_completed:
+        due = todo.due
+        if due:
+            datetime_bounds, date_bounds = self._due_bounds()
+            if isinstance(due, datetime):
+                now, tomorrow = datetime_bounds
+            else:
+                now, tomorrow = date_bounds
+            if due <= now and not todo.is_completed:
                 return "red"
-            if todo.due >= now + timedelta(hours=24):
+            if due >= tomorrow:
                 return "white"
-            if todo.due >= now:
+            if due >= now:
                 return "yellow"
 
         return "white"
@@ -200,9 +407,21 @@ class DefaultFormatter(Formatter):
         if not dt:
             return ""
         if isinstance(dt, datetime):
-            return dt.strftime(self.datetime_format)
+            if self._iso_datetime_format:
+                return (
+                    f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} "
+                    f"{dt.hour:02d}:{dt.minute:02d}"
+                )
+            if self._tz_datetime_format:
+                return dt.strftime(self.datetime_format)
+            # Equal instants in different timezones compare (and hash) equal, so
+            # would share a cache entry. The tzinfo doesn't affect the output
+            # here, so cache on the naive value instead.
+            return _strftime(dt.replace(tzinfo=None), self.datetime_format)
         if isinstance(dt, date):
-            return dt.strftime(self.date_format)
+            if self._iso_date_format:
+                return dt.isoformat()
+            return _strftime(dt, self.date_format)
         return None
 
     def format_categories(self, categories: Iterable[str]) -> str:
@@ -216,39 +435,24 @@ class DefaultFormatter(Formatter):
     def parse_priority(self, priority: str | None) -> int | None:
         if priority is None or priority == "":
             return None
-        if priority == "low":
-            return 9
-        if priority == "medium":
-            return 5
-        if priority == "high":
-            return 4
-        if priority == "none":
-            return 0
-        raise ValueError("Priority has to be one of low, medium, high or none")
+        try:
+            return _PRIORITY_VALUES[priority]
+        except KeyError:
+            raise ValueError(
+                "Priority has to be one of low, medium, high or none"
+            ) from None
 
     def format_priority(self, priority: int | None) -> str:
-        if not priority:
-            return "none"
-        if 1 <= priority <= 4:
-            return "high"
-        if priority == 5:
-            return "medium"
-        if 6 <= priority <= 9:
-            return "low"
-
-        raise ValueError("priority is an invalid value")
+        try:
+            return _PRIORITY_NAMES[priority or 0]
+        except KeyError:
+            raise ValueError("priority is an invalid value") from None
 
     def format_priority_compact(self, priority: int | None) -> str:
-        if not priority:
-            return ""
-        if 1 <= priority <= 4:
-            return "!!!"
-        if priority == 5:
-            return "!!"
-        if 6 <= priority <= 9:
-            return "!"
-
-        raise ValueError("priority is an invalid value")
+        try:
+            return _PRIORITY_MARKS[priority or 0]
+        except KeyError:
+            raise ValueError("priority is an invalid value") from None
 
     def parse_datetime(self, dt: str | None) -> date | None:
         if not dt:
@@ -259,26 +463,30 @@ class DefaultFormatter(Formatter):
 
     def _parse_datetime_naive(self, dt: str) -> date:
         """Parse dt and returns a naive datetime or a date"""
-        with contextlib.suppress(ValueError):
-            return datetime.strptime(dt, self.datetime_format)
-
-        with contextlib.suppress(ValueError):
-            return datetime.strptime(dt, self.date_format).date()
-
-        with contextlib.suppress(ValueError):
-            return datetime.combine(
-                self.now.date(), datetime.strptime(dt, self.time_format).time()
-            )
+        rv = _parse_formatted(
+            dt,
+            self.datetime_format,
+            self.date_format,
+            self.time_format,
+            self.now.date(),
+        )
+        if rv is not None:
+            return rv
 
-        rv, pd_ctx = self._parsedatetime_calendar.parse(dt)
+        struct, pd_ctx = self._parsedatetime_calendar.parse(dt)
         if not pd_ctx.hasDateOrTime:
             raise ValueError(f"Time description not recognized: {dt}")
-        return datetime.fromtimestamp(mktime(rv))
+        return datetime.fromtimestamp(mktime(struct))
 
     def format_database(self, database: TodoList) -> str:
-        return "{}@{}".format(
-            rgb_to_ansi(database.colour) or "", click.style(database.name)
-        )
+        # Each todo's list gets formatted, but there are only a few lists.
+        key = (database.name, database.colour)
+        label = self._list_labels.get(key)
+        if label is None:
+            label = self._list_labels[key] = (
+                f"{rgb_to_ansi(database.colour) or ''}@{database.name}{_STYLE_RESET}"
+            )
+        return label
 
 
 class HumanizedFormatter(DefaultFormatter):
@@ -286,39 +494,71 @@ class HumanizedFormatter(DefaultFormatter):
         if not dt:
             return ""
 
-        if isinstance(dt, datetime):
-            rv = humanize.naturaltime(self.now - dt)
-            if " from now" in rv:
-                rv = f"in {rv[:-9]}"
-        elif isinstance(dt, date):
-            rv = humanize.naturaldate(dt)
+        return _humanize(dt, self.now)
 
-        return rv
+
+# Formatting dates is relatively slow, and the todos in a listing tend to share
+# the same few dates, so the helpers below are memoised.
+
+
+@lru_cache(maxsize=256)
+def _strftime(dt: date, fmt: str) -> str:
+    """Returns dt (a date or a naive datetime) formatted with fmt."""
+    return dt.strftime(fmt)
+
+
+@lru_cache(maxsize=256)
+def _humanize(dt: date, now: datetime) -> str:
+    """Returns a human friendly representation of dt, relative to now."""
+    if isinstance(dt, datetime):
+        rv = humanize.naturaltime(now - dt)
+        if " from now" in rv:
+            rv = f"in {rv[:-9]}"
+    else:
+        rv = humanize.naturaldate(dt)
+
+    return rv
+
+
+# The result depends on the process's local timezone, which isn't part of the key.
+# Code which changes it in-process (e.g.: setting $TZ and calling time.tzset())
+# must call _date_timestamp.cache_clear() too.
+@lru_cache(maxsize=256)
+def _date_timestamp(value: date) -> int:
+    """Returns the timestamp for the start of a date, in local time."""
+    return int(datetime(value.year, value.month, value.day).timestamp())
 
 
 class PorcelainFormatter(DefaultFormatter):
     def _todo_as_dict(self, todo: Todo) -> dict:
+        format_datetime = self.format_datetime
+        # Keys are in sorted order, so the output doesn't need sorting.
         return {
+            "categories": todo.categories,
             "completed": todo.is_completed,
-            "start": self.format_datetime(todo.start),
-            "due": self.format_datetime(todo.due),
+            "completed_at": format_datetime(todo.completed_at),
+            "description": todo.description,
+            "due": format_datetime(todo.due),
             "id": todo.id,
             "list": todo.list.name if todo.list else None,
+            "location": todo.location,
             "percent": todo.percent_complete,
-            "summary": todo.summary,
-            "categories": todo.categories,
             "priority": todo.priority,
-            "location": todo.location,
-            "description": todo.description,
-            "completed_at": self.format_datetime(todo.completed_at),
+            "start": format_datetime(todo.start),
+            "summary": todo.summary,
         }
 
     def compact(self, todo: Todo) -> str:
-        return json.dumps(self._todo_as_dict(todo), indent=4, sort_keys=True)
+        return json.dumps(self._todo_as_dict(todo), indent=4)
 
     def compact_multiple(self, todos: Iterable[Todo], hide_list: bool = False) -> str:
         data = [self._todo_as_dict(todo) for todo in todos]
-        return json.dumps(data, indent=4, sort_keys=True)
+        return json.dumps(data, indent=4)
+
+    def compact_lines(
+        self, todos: Iterable[Todo], hide_list: bool = False
+    ) -> Iterator[str]:
+        yield self.compact_multiple(todos, hide_list)
 
     def simple_action(self, action: str, todo: Todo) -> str:
         return self.compact(todo)
@@ -339,10 +579,8 @@ class PorcelainFormatter(DefaultFormatter):
     def format_datetime(self, value: date | None) -> int | None:
         if value:
             if not isinstance(value, datetime):
-                dt = datetime.fromordinal(value.toordinal())
-            else:
-                dt = value
-            return int(dt.timestamp())
+                return _date_timestamp(value)
+            return int(value.timestamp())
         return None
 
     def parse_datetime(self, value: str | float | None) -> datetime | None:
@@ -4,6 +4,8 @@ import logging
 import os
 import socket
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import date
 from datetime import datetime
 from datetime import time
@@ -12,6 +14,7 @@ from datetime import timezone
 from functools import cached_property
 from os.path import normpath
 from os.path import split
+from time import perf_counter
 from typing import Iterable
 from typing import Iterator
 from uuid import uuid4
@@ -305,7 +308,7 @@ class VtodoWriter:
 
         return dt.astimezone(timezone.utc)
 
-    def serialize(self, original: icalendar.Todo = None) -> icalendar.Todo:
+    def serialize(self, original: icalendar.Todo | None = None) -> icalendar.Todo:
         """Serialize a Todo into a VTODO."""
         if not original:
             original = icalendar.Todo()
@@ -335,14 +338,6 @@ class VtodoWriter:
 
         return self.vtodo
 
-    def _read(self, path: str) -> icalendar.Todo:
-        with open(path, "rb") as f:
-            cal = f.read()
-            data = icalendar.Calendar.from_ical(cal)
-            for component in data.walk("VTODO"):
-                return component
-            return None
-
     def write(self) -> icalendar.Todo:
         if os.path.exists(self.todo.path):
             self._write_existing(self.todo.path)
@@ -352,14 +347,15 @@ class VtodoWriter:
         return self.vtodo
 
     def _write_existing(self, path: str) -> None:
-        original = self._read(path)
-        vtodo = self.serialize(original)
-
         with open(path, "rb") as f:
             cal = icalendar.Calendar.from_ical(f.read())
-            for index, component in enumerate(cal.subcomponents):
-                if component.get("uid", None) == self.todo.uid:
-                    cal.subcomponents[index] = vtodo
+
+        # The VTODO is updated in-place, so the rest of the calendar (and any
+        # unknown fields) are preserved when writing it back.
+        original = next(
+            (c for c in cal.walk("VTODO") if isinstance(c, icalendar.Todo)), None
+        )
+        self.serialize(original)
 
         with AtomicWriter(path, "wb", overwrite=True).open() as f:
             f.write(cal.to_ical())
@@ -391,7 +387,7 @@ class Cache:
     may be used for filtering/sorting.
     """
 
-    SCHEMA_VERSION = 10
+    SCHEMA_VERSION = 11
 
     def __init__(self, path: str) -> None:
         self.cache_path = str(path)
@@ -508,6 +504,11 @@ class Cache:
         """
         )
 
+        # Without this, every cascading delete from files scans all todos.
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS todos_file_path ON todos (file_path)"
+        )
+
     def clear(self) -> None:
         self._conn.close()
         os.remove(self.cache_path)
@@ -712,6 +713,8 @@ class Cache:
         start: tuple[bool, datetime] | None = None,
         startable: bool = False,
         status: str = "NEEDS-ACTION,IN-PROCESS",
+        limit: int | None = None,
+        completed: bool | None = None,
     ) -> Iterator[Todo]:
         """
         Returns filtered cached todos, in a specified order.
@@ -726,7 +729,8 @@ class Cache:
         :param lists: Only return todos for these lists.
         :param location: Only return todos with a location containing this string.
         :param categories: Only return todos with a category containing this string.
-        :param grep: Filter common fields with this substring.
+        :param grep: Only return todos with a summary or description containing
+            this string.
         :param sort: Order returned todos by these fields. Field names
             with a ``-`` prepended will be used to sort in reverse order.
         :param reverse: Reverse the order of the todos after sorting.
@@ -734,6 +738,9 @@ class Cache:
         :param priority: Only return todos with priority at least as high as specified.
         :param start: Return only todos before/after ``start`` date
         :param status: Return only todos with any of the given statuses.
+        :param limit: Return at most this many todos.
+        :param completed: If set, return only todos which are (or are not)
+            completed or cancelled, regardless of ``status``.
         :return: A sorted, filtered list of todos.
         """
         extra_where = []
@@ -769,8 +776,8 @@ class Cache:
             # # requires sqlite with pcre, which won't be available everywhere:
             # extra_where.append('AND summary REGEXP ?')
             # params.append(grep)
-            extra_where.append("AND summary LIKE ?")
-            params.append(f"%{grep}%")
+            extra_where.append("AND (summary LIKE ? OR description LIKE ?)")
+            params.extend([f"%{grep}%"] * 2)
         if due:
             max_due = (datetime.now() + timedelta(hours=due)).timestamp()
             extra_where.append("AND due IS NOT NULL AND due < ?")
@@ -787,6 +794,16 @@ class Cache:
         if startable:
             extra_where.append("AND (start IS NULL OR start <= ?)")
             params.append(datetime.now().timestamp())
+        if completed is not None:
+            # Equivalent to Todo.is_completed
+            is_completed = (
+                "(completed_at IS NOT NULL "
+                "OR coalesce(status, '') IN ('CANCELLED', 'COMPLETED'))"
+            )
+            if completed:
+                extra_where.append(f"AND {is_completed}")
+            else:
+                extra_where.append(f"AND NOT {is_completed}")
         if sort:
             order_items = []
             for s in sort:
@@ -821,6 +838,9 @@ class Cache:
             " ".join(extra_where),
             order,
         )
+        if limit is not None:
+            query += "LIMIT ?"
+            params.append(limit)
 
         logger.debug(query)
         logger.debug(params)
@@ -901,6 +921,10 @@ class Cache:
     def lists_map(self) -> dict[str, TodoList]:
         return {list_.name: list_ for list_ in self.lists()}
 
+    def expire_lists_map(self) -> None:
+        """Forget ``lists_map``, so that it is rebuilt on next access."""
+        self.__dict__.pop("lists_map", None)
+
     def expire_lists(self, paths: dict[str, int]) -> None:
         results = self._conn.execute("SELECT path, name, mtime from lists")
         for result in results:
@@ -916,37 +940,63 @@ class Cache:
 
     def todo(self, id: int, read_only: bool = False) -> Todo:
         # XXX: DON'T USE READ_ONLY
-        result = self._conn.execute(
-            """
-            SELECT todos.*, files.list_name, files.path,
-              group_concat(category) AS categories
-            FROM todos, files
-            LEFT JOIN categories
-            ON categories.todos_id = todos.id
-            WHERE files.path = todos.file_path
-              AND todos.id = ?
-            GROUP BY uid
-        """,
-            (id,),
-        ).fetchone()
+        return self.todos_by_ids([id], read_only=read_only)[0]
 
-        if not result:
-            raise exceptions.NoSuchTodoError(id)
+    def todos_by_ids(self, ids: Iterable[int], read_only: bool = False) -> list[Todo]:
+        """
+        Returns the todos with the given ids, in the same order, with a single
+        query.
 
-        if not read_only:
-            count = self._conn.execute(
-                """
-                SELECT count(id) AS c
-                  FROM files, todos
-                 WHERE todos.file_path = files.path
-                   AND path=?
-            """,
-                (result["path"],),
-            ).fetchone()
-            if count["c"] > 1:
-                raise exceptions.ReadOnlyTodoError(result["path"])
+        :raises NoSuchTodoError: If any of the ids does not exist.
+        :raises ReadOnlyTodoError: Unless ``read_only`` is set, if any of the
+            todos shares its file with other todos.
+        """
+        ids = list(ids)
+        slots = ", ".join(["?"] * len(ids))
+        rows = {
+            row["id"]: row
+            for row in self._conn.execute(
+                f"""
+                SELECT todos.*, files.list_name, files.path,
+                  group_concat(category) AS categories
+                FROM todos, files
+                LEFT JOIN categories
+                ON categories.todos_id = todos.id
+                WHERE files.path = todos.file_path
+                  AND todos.id IN ({slots})
+                GROUP BY todos.id
+                """,
+                ids,
+            )
+        }
+
+        shared_paths: set[str] = set()
+        if not read_only and rows:
+            paths = {row["path"] for row in rows.values()}
+            path_slots = ", ".join(["?"] * len(paths))
+            shared_paths = {
+                row["file_path"]
+                for row in self._conn.execute(
+                    f"""
+                    SELECT file_path
+                      FROM todos
+                     WHERE file_path IN ({path_slots})
+                  GROUP BY file_path
+                    HAVING count(id) > 1
+                    """,
+                    list(paths),
+                )
+            }
 
-        return self._todo_from_db(result)
+        todos = []
+        for id in ids:
+            if id not in rows:
+                raise exceptions.NoSuchTodoError(id)
+            if rows[id]["path"] in shared_paths:
+                raise exceptions.ReadOnlyTodoError(rows[id]["path"])
+            todos.append(self._todo_from_db(rows[id]))
+
+        return todos
 
     def expire_files(self, paths_to_mtime: dict[str, int]) -> None:
         """Remove stale cache entries based on the given fresh data."""
@@ -1020,27 +1070,38 @@ class Database:
     def __init__(self, paths: Iterable[str], cache_path: str) -> None:
         self.cache = Cache(cache_path)
         self.paths = [str(path) for path in paths]
+        self._in_transaction = False
         self.update_cache()
 
     def update_cache(self) -> None:
         paths = {path: TodoList.mtime_for_path(path) for path in self.paths}
         self.cache.expire_lists(paths)
 
+        # Scanning lists is I/O bound. On local disks it's fast enough that a
+        # thread pool only adds overhead, but on slow (e.g.: network)
+        # filesystems the remaining lists are scanned concurrently if the first
+        # one was slow. The cache itself is only touched from this thread, since
+        # the sqlite connection cannot be shared.
+        first, rest = self.paths[:1], self.paths[1:]
+        start = perf_counter()
+        scans = [_ics_mtimes(path) for path in first]
+        if rest and perf_counter() - start >= _CONCURRENT_SCAN_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=min(32, len(rest))) as pool:
+                scans.extend(pool.map(_ics_mtimes, rest))
+        else:
+            scans.extend(_ics_mtimes(path) for path in rest)
+
         paths_to_mtime = {}
         paths_to_list_name = {}
 
-        for path in self.paths:
+        for path, entries in zip(self.paths, scans):
             list_name = self.cache.add_list(
                 TodoList.name_for_path(path),
                 path,
                 TodoList.colour_for_path(path),
                 paths[path],
             )
-            for entry in os.listdir(path):
-                if not entry.endswith(".ics"):
-                    continue
-                entry_path = os.path.join(path, entry)
-                mtime = _getmtime(entry_path)
+            for entry_path, mtime in entries.items():
                 paths_to_mtime[entry_path] = mtime
                 paths_to_list_name[entry_path] = list_name
 
@@ -1064,6 +1125,26 @@ class Database:
                 logger.exception("Failed to read entry %s.", entry_path)
 
         self.cache.save_to_disk()
+        self.cache.expire_lists_map()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Batch the cache updates of multiple operations into a single commit.
+
+        Todos saved inside this block are still written to disk immediately;
+        only committing their cache entries is deferred until the block exits.
+        """
+        if self._in_transaction:
+            yield
+            return
+
+        self._in_transaction = True
+        try:
+            yield
+        finally:
+            self._in_transaction = False
+            self.cache.save_to_disk()
 
     def todos(self, **kwargs) -> Iterator[Todo]:
         return self.cache.todos(**kwargs)
@@ -1071,9 +1152,17 @@ class Database:
     def todo(self, id: int, **kwargs) -> Todo:
         return self.cache.todo(id, **kwargs)
 
+    def todos_by_ids(self, ids: Iterable[int], **kwargs) -> list[Todo]:
+        return self.cache.todos_by_ids(ids, **kwargs)
+
     def lists(self) -> Iterator[TodoList]:
         return self.cache.lists()
 
+    @property
+    def lists_map(self) -> dict[str, TodoList]:
+        """All lists, indexed by name."""
+        return self.cache.lists_map
+
     def move(self, todo: Todo, new_list: TodoList, from_list: TodoList) -> None:
         orig_path = os.path.join(from_list.path, todo.filename)
         dest_path = os.path.join(new_list.path, todo.filename)
@@ -1088,10 +1177,9 @@ class Database:
         os.remove(path)
 
     def flush(self) -> Iterable[Todo]:
-        for todo in self.todos(status=["ANY"]):
-            if todo.is_completed:
-                yield todo
-                self.delete(todo)
+        for todo in self.todos(status="ANY", completed=True):
+            yield todo
+            self.delete(todo)
 
         self.cache.clear()
         self.cache = Cache(self.cache.cache_path)
@@ -1113,8 +1201,24 @@ class Database:
 
         self.cache.add_file(todo.list.name, todo.path, mtime)
         todo.id = self.cache.add_vtodo(vtodo, todo.path, todo.id)
-        self.cache.save_to_disk()
+        if not self._in_transaction:
+            self.cache.save_to_disk()
 
 
 def _getmtime(path: str) -> int:
     return os.stat(path).st_mtime_ns
+
+
+# Lists are scanned concurrently if scanning the first one took at least this
+# long (in seconds). Local scans of a few hundred files take well under 1ms.
+_CONCURRENT_SCAN_THRESHOLD = 0.01
+
+
+def _ics_mtimes(path: str) -> dict[str, int]:
+    """Returns the path and mtime of each icalendar file in a list."""
+    with os.scandir(path) as entries:
+        return {
+            entry.path: entry.stat().st_mtime_ns
+            for entry in entries
+            if entry.name.endswith(".ics")
+        }